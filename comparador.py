@@ -7,12 +7,50 @@ coincide por nombre) y el tamaño para los archivos cuando está
 disponible.
 """
 
+import io
 import json
 import os
+import sys
+import threading
 import tkinter as tk
-from typing import cast
+from array import array
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, cast
 from tkinter import filedialog, messagebox, scrolledtext, ttk
 
+# Códigos compactos de tipo de entrada usados en ``ScanResult.types``.
+TYPE_DIR = 0
+TYPE_FILE = 1
+# Valor reservado en ``ScanResult.sizes`` para carpetas o tamaños ilegibles.
+SIZE_UNKNOWN = -1
+
+# Estados posibles de una ruta como tuplas (izquierda, derecha, difiere)
+# compartidas: cada entrada de ``comparison_data`` referencia uno de estos
+# cuatro singletons en vez de cargar con cadenas y diccionarios propios.
+STATUS_MATCH = ("Coincide", "Coincide", False)
+STATUS_TYPE_MISMATCH = ("Tipo distinto", "Tipo distinto", True)
+STATUS_ONLY_LEFT = ("Solo izquierda", "No existe", True)
+STATUS_ONLY_RIGHT = ("No existe", "Solo derecha", True)
+
+
+@dataclass
+class ScanResult:
+    """Resultado de escanear una carpeta, en arreglos paralelos compactos.
+
+    En lugar de un diccionario por entrada (unos 200 bytes cada uno), las
+    rutas, tipos y tamaños viven en arreglos paralelos; ``index`` da la
+    posición de cada ruta y los índices de hijos y padres sirven para poblar
+    los árboles y propagar diferencias sin volver a partir rutas.
+    """
+
+    paths: list[str] = field(default_factory=lambda: [""])
+    types: array = field(default_factory=lambda: array("b", [TYPE_DIR]))
+    sizes: array = field(default_factory=lambda: array("q", [SIZE_UNKNOWN]))
+    index: dict[str, int] = field(default_factory=lambda: {"": 0})
+    children_by_parent: dict[str, list[str]] = field(default_factory=dict)
+    parent_of: dict[str, str] = field(default_factory=dict)
+
 
 class FolderComparator(tk.Tk):
     """Ventana principal que gestiona la comparación de carpetas."""
@@ -32,14 +70,47 @@ class FolderComparator(tk.Tk):
         self.right_item_paths: dict[str, str] = {}
         self.left_base_path: str | None = None
         self.right_base_path: str | None = None
-        self.comparison_data: dict[str, dict[str, object]] = {}
+        self.comparison_data: dict[str, tuple[str, str, bool]] = {}
         self.difference_paths: set[str] = set()
         self.show_differences_only = tk.BooleanVar(value=False)
         self.debug_enabled = tk.BooleanVar(value=True)
         self._debug_sample_limit = 15
-
-        self._last_left_entries: dict[str, dict[str, object]] | None = None
-        self._last_right_entries: dict[str, dict[str, object]] | None = None
+        self._scan_max_workers = 16
+        self._log_buffer: list[str] = []
+        self._log_pending = False
+
+        # Virtualización de filas: las carpetas con muchísimos hijos se
+        # materializan por tandas a medida que el usuario se acerca al final
+        # del scroll, en vez de insertar todas las filas de una vez.
+        self._render_chunk_size = 400
+        self._pending_children: dict[str, dict[str, int]] = {"left": {}, "right": {}}
+
+        # Pool dedicado a lecturas de archivos para la previsualización, de
+        # modo que un archivo grande o en un montaje lento no congele la UI.
+        self._io_pool = ThreadPoolExecutor(max_workers=2)
+        self._preview_read_limit = 262144
+        self._preview_after_id: str | None = None
+        # Número de generación por panel: cada solicitud de previsualización
+        # lo incrementa y los resultados de lecturas viejas se descartan, para
+        # que una lectura lenta no pise la selección más reciente.
+        self._preview_generations: dict[scrolledtext.ScrolledText, int] = {}
+
+        self._last_left_scan: ScanResult | None = None
+        self._last_right_scan: ScanResult | None = None
+        self._scan_in_progress = False
+        # Caché de escaneos por carpeta base, validada con el mtime_ns de la
+        # raíz; ver _scan_cached.
+        self._scan_cache: dict[str, tuple[int, ScanResult]] = {}
+
+        # Datos usados por la expansión perezosa de los árboles: por lado se
+        # guardan el escaneo y el conjunto de rutas visibles (None = todas).
+        self._lazy_state: dict[str, tuple[ScanResult, set[str] | None]] = {}
+
+        # Caché de rutas visibles por valor del filtro de diferencias;
+        # se invalida solo cuando se vuelve a comparar.
+        self._filtered_cache: dict[
+            bool, tuple[set[str] | None, set[str] | None]
+        ] = {}
 
         self._build_layout()
 
@@ -176,10 +247,15 @@ class FolderComparator(tk.Tk):
 
         tree.grid(row=0, column=0, sticky="nsew")
         scrollbar = ttk.Scrollbar(master, orient="vertical", command=tree.yview)
-        tree.configure(yscrollcommand=scrollbar.set)
+        tree.configure(
+            yscrollcommand=lambda first, last: self._on_tree_scroll(
+                tree, scrollbar, first, last
+            )
+        )
         scrollbar.grid(row=0, column=1, sticky="ns")
 
         tree.bind("<<TreeviewSelect>>", self._on_selection_change)
+        tree.bind("<<TreeviewOpen>>", self._on_tree_open)
         return tree
 
     def _create_preview(self, master: tk.Misc) -> scrolledtext.ScrolledText:
@@ -224,8 +300,104 @@ class FolderComparator(tk.Tk):
         self._update_tree_title("left")
         self._update_tree_title("right")
 
-        left_entries = self._scan_directory(left_dir)
-        right_entries = self._scan_directory(right_dir)
+        if self._scan_in_progress:
+            self._log_debug("Escaneo en curso; se ignora la nueva solicitud.")
+            return
+
+        # El escaneo corre en un hilo aparte para no congelar la ventana;
+        # el resultado vuelve al bucle de Tk mediante after().
+        self._scan_in_progress = True
+        self._log_debug("Escaneo iniciado en segundo plano.")
+        threading.Thread(
+            target=self._scan_in_background,
+            args=(left_dir, right_dir),
+            daemon=True,
+        ).start()
+
+    def _scan_in_background(self, left_dir: str, right_dir: str) -> None:
+        """Escanea ambas carpetas fuera del hilo de Tk y reprograma el final.
+
+        El pool queda reservado para los listados hoja de
+        ``_scan_one_directory``: los dos recorridos por niveles se conducen
+        desde hilos propios (este y uno auxiliar). Si los recorridos se
+        enviaran al mismo pool del que luego esperan resultados, con pocos
+        workers se produciría un interbloqueo por envíos anidados.
+
+        Cualquier excepción de cualquiera de los dos recorridos vuelve al
+        hilo de Tk mediante ``_scan_failed``: nada puede dejar
+        ``_scan_in_progress`` trabado en ``True`` en silencio.
+        """
+
+        try:
+            with ThreadPoolExecutor(max_workers=self._scan_max_workers) as executor:
+                left_scan: ScanResult | None = None
+                left_error: Exception | None = None
+
+                def scan_left() -> None:
+                    nonlocal left_scan, left_error
+                    try:
+                        left_scan = self._scan_cached(left_dir, executor)
+                    except Exception as exc:
+                        left_error = exc
+
+                left_thread = threading.Thread(target=scan_left, daemon=True)
+                left_thread.start()
+                right_scan = self._scan_cached(right_dir, executor)
+                left_thread.join()
+                if left_error is not None:
+                    raise left_error
+                assert left_scan is not None
+        except Exception as exc:
+            self.after(0, self._scan_failed, exc)
+            return
+
+        self.after(0, self._finish_comparison, left_dir, right_dir, left_scan, right_scan)
+
+    def _scan_failed(self, exc: Exception) -> None:
+        """Restablece el estado de escaneo y reporta el error en el hilo de Tk."""
+
+        self._scan_in_progress = False
+        self._log_debug(lambda: f"Escaneo fallido: {exc}")
+        messagebox.showerror(
+            "Error al escanear",
+            f"No se pudo completar el escaneo: {exc}",
+        )
+
+    def _scan_cached(self, base_path: str, executor: ThreadPoolExecutor) -> ScanResult:
+        """Devuelve el escaneo cacheado si la raíz no cambió desde la última vez.
+
+        La clave es el mtime_ns de la carpeta raíz: cambios directamente en
+        la raíz (crear/borrar/renombrar entradas) lo actualizan y fuerzan el
+        re-escaneo. Cambios solo en subcarpetas no tocan el mtime de la raíz,
+        así que la caché puede servir datos algo viejos entre dos clics de
+        "Comparar ahora"; es el compromiso que se acepta a cambio de que
+        repetir una comparación sobre árboles grandes sea inmediato.
+        """
+
+        try:
+            root_mtime = os.stat(base_path).st_mtime_ns
+        except OSError:
+            return self._scan_directory(base_path, executor)
+
+        cached = self._scan_cache.get(base_path)
+        if cached is not None and cached[0] == root_mtime:
+            self._log_debug(lambda: f"Escaneo de '{base_path}' reutilizado de la caché.")
+            return cached[1]
+
+        scan = self._scan_directory(base_path, executor)
+        self._scan_cache[base_path] = (root_mtime, scan)
+        return scan
+
+    def _finish_comparison(
+        self,
+        left_dir: str,
+        right_dir: str,
+        left_scan: ScanResult,
+        right_scan: ScanResult,
+    ) -> None:
+        """Aplica en el hilo de Tk los resultados de un escaneo terminado."""
+
+        self._scan_in_progress = False
 
         self.left_base_path = left_dir
         self.right_base_path = right_dir
@@ -233,15 +405,18 @@ class FolderComparator(tk.Tk):
         self.left_item_paths = {}
         self.right_item_paths = {}
 
-        self._last_left_entries = left_entries
-        self._last_right_entries = right_entries
+        self._last_left_scan = left_scan
+        self._last_right_scan = right_scan
         self._log_debug(
-            f"Escaneo completado. Izquierda: {len(left_entries)} entradas, "
-            f"Derecha: {len(right_entries)} entradas."
+            lambda: (
+                f"Escaneo completado. Izquierda: {len(left_scan.paths)} entradas, "
+                f"Derecha: {len(right_scan.paths)} entradas."
+            )
         )
         self.comparison_data, self.difference_paths = self._build_comparison(
-            left_entries, right_entries
+            left_scan, right_scan
         )
+        self._filtered_cache.clear()
 
         self._refresh_trees()
 
@@ -251,7 +426,7 @@ class FolderComparator(tk.Tk):
     def _on_filter_change(self) -> None:
         """Aplica el filtro sin requerir un reescaneo si ya hay datos cargados."""
 
-        if self._last_left_entries is None or self._last_right_entries is None:
+        if self._last_left_scan is None or self._last_right_scan is None:
             self.update_comparison()
             return
 
@@ -265,64 +440,68 @@ class FolderComparator(tk.Tk):
     def _refresh_trees(self) -> None:
         """Puebla ambos árboles usando los datos de la última comparación."""
 
-        if self._last_left_entries is None or self._last_right_entries is None:
+        if self._last_left_scan is None or self._last_right_scan is None:
             return
 
-        filtered_left = self._filter_entries_for_display(self._last_left_entries)
-        filtered_right = self._filter_entries_for_display(self._last_right_entries)
+        show_only_differences = self.show_differences_only.get()
+        cached = self._filtered_cache.get(show_only_differences)
+        if cached is None:
+            cached = self._filter_entries_for_display(
+                self._last_left_scan, self._last_right_scan
+            )
+            self._filtered_cache[show_only_differences] = cached
+        visible_left, visible_right = cached
 
         self._populate_tree(
             tree=self.left_tree,
             base_path=self.left_base_path or "",
-            entries=filtered_left,
+            scan=self._last_left_scan,
+            visible=visible_left,
             path_store=self.left_item_paths,
             side="left",
         )
         self._populate_tree(
             tree=self.right_tree,
             base_path=self.right_base_path or "",
-            entries=filtered_right,
+            scan=self._last_right_scan,
+            visible=visible_right,
             path_store=self.right_item_paths,
             side="right",
         )
 
     def _filter_entries_for_display(
-        self, entries: dict[str, dict[str, object]]
-    ) -> dict[str, dict[str, object]]:
-        """Devuelve las entradas ya comparadas respetando el filtro de diferencias."""
+        self, left_scan: ScanResult, right_scan: ScanResult
+    ) -> tuple[set[str] | None, set[str] | None]:
+        """Calcula las rutas visibles de ambos lados en una sola pasada.
+
+        Devuelve ``None`` por lado cuando el filtro está apagado (todo es
+        visible).
+        """
 
         if not self.show_differences_only.get():
             self._log_debug(
-                f"Filtro desactivado: se muestran todas las {len(entries)} entradas."
+                "Filtro desactivado: se muestran todas las "
+                f"{len(left_scan.paths)} y {len(right_scan.paths)} entradas."
             )
-            return entries
+            return None, None
 
-        filtered: dict[str, dict[str, object]] = {}
-        skipped_samples: list[str] = []
-        for path, info in entries.items():
-            if path == "" or self._is_path_relevant(path):
-                filtered[path] = info
-            elif len(skipped_samples) < self._debug_sample_limit:
-                status = self.comparison_data.get(path, {})
-                skipped_samples.append(f"{path} -> {status}")
+        # ``difference_paths`` ya contiene las rutas relevantes y todos sus
+        # ancestros, así que basta con intersecarlo con cada lado.
+        difference_paths = self.difference_paths
+        visible_left = difference_paths & left_scan.index.keys()
+        visible_left.add("")
+        visible_right = difference_paths & right_scan.index.keys()
+        visible_right.add("")
 
         self._log_debug(
-            "Filtro activado: conservadas "
-            f"{len(filtered)} de {len(entries)} entradas."
-        )
-        if skipped_samples:
-            self._log_debug(
-                "Ejemplos de rutas omitidas por coincidir en ambos lados:\n"
-                + "\n".join(skipped_samples)
+            lambda: (
+                "Filtro activado: conservadas "
+                f"{len(visible_left)} de {len(left_scan.paths)} entradas a la "
+                f"izquierda y {len(visible_right)} de {len(right_scan.paths)} a "
+                "la derecha."
             )
-        return filtered
-
-    def _is_path_relevant(self, path: str) -> bool:
-        """Indica si una ruta debe mostrarse cuando se piden solo diferencias."""
-
-        comparison_info = self.comparison_data.get(path)
-        differs = bool(comparison_info and comparison_info.get("differs"))
-        return differs or path in self.difference_paths
+        )
+        return visible_left, visible_right
 
     def _update_tree_title(self, side: str) -> None:
         """Muestra el nombre de la carpeta seleccionada sobre el árbol correspondiente."""
@@ -342,169 +521,337 @@ class FolderComparator(tk.Tk):
         else:
             title_var.set(f"{label} (sin seleccionar)")
 
-    def _scan_directory(self, base_path: str) -> dict[str, dict[str, object]]:
-        """Genera un diccionario con todos los elementos dentro de un directorio."""
-        entries: dict[str, dict[str, object]] = {"": {"type": "dir"}}
-        for current, dirs, files in os.walk(base_path):
-            rel_dir = os.path.relpath(current, base_path)
-            rel_dir = "" if rel_dir == "." else rel_dir
-            for directory in dirs:
-                rel_path = os.path.join(rel_dir, directory)
-                entries[rel_path] = {"type": "dir"}
-            for filename in files:
-                rel_path = os.path.join(rel_dir, filename)
-                file_path = os.path.join(current, filename)
+    def _scan_directory(
+        self, base_path: str, executor: ThreadPoolExecutor | None = None
+    ) -> ScanResult:
+        """Genera las entradas de un directorio y sus índices de hijos y padres.
+
+        Usa ``os.scandir`` en lugar de ``os.walk`` para aprovechar los datos
+        que el sistema ya devuelve al listar (tipo y tamaño de cada entrada),
+        evitando una llamada ``stat`` adicional por archivo. Los listados de
+        subdirectorios se reparten en un ``ThreadPoolExecutor`` por niveles,
+        de modo que en sistemas de archivos con latencia alta (unidades de
+        red) varios directorios se listan en paralelo.
+
+        Los índices ``children_by_parent`` y ``parent_of`` se arman aquí
+        mismo, con los valores que el escaneo ya tiene a mano, para que ni
+        poblar los árboles ni propagar diferencias a los ancestros tengan
+        que volver a partir cada ruta.
+        """
+        if executor is None:
+            with ThreadPoolExecutor(max_workers=self._scan_max_workers) as own:
+                return self._scan_directory(base_path, own)
+
+        result = ScanResult()
+        pending: list[tuple[str, str]] = [(base_path, "")]
+        while pending:
+            futures = [
+                executor.submit(self._scan_one_directory, current, rel_prefix)
+                for current, rel_prefix in pending
+            ]
+            pending = []
+            for future in as_completed(futures):
+                parent_rel, local_paths, local_types, local_sizes, subdirectories = (
+                    future.result()
+                )
+                if local_paths:
+                    position = len(result.paths)
+                    for rel_path in local_paths:
+                        result.index[rel_path] = position
+                        result.parent_of[rel_path] = parent_rel
+                        position += 1
+                    result.paths.extend(local_paths)
+                    result.types.extend(local_types)
+                    result.sizes.extend(local_sizes)
+                    result.children_by_parent[parent_rel] = sorted(local_paths)
+                pending.extend(subdirectories)
+        return result
+
+    def _scan_one_directory(
+        self, current: str, rel_prefix: str
+    ) -> tuple[str, list[str], list[int], list[int], list[tuple[str, str]]]:
+        """Lista un solo directorio y devuelve sus entradas y subdirectorios."""
+
+        parent_rel = rel_prefix[:-1] if rel_prefix else ""
+        local_paths: list[str] = []
+        local_types: list[int] = []
+        local_sizes: list[int] = []
+        subdirectories: list[tuple[str, str]] = []
+        try:
+            with os.scandir(current) as iterator:
+                entries = list(iterator)
+        except OSError:
+            return parent_rel, local_paths, local_types, local_sizes, subdirectories
+
+        # En POSIX el listado se procesa en orden de inodo: en discos
+        # rotativos o montajes de red los stats posteriores caen así en
+        # posiciones cercanas del disco y se reducen los saltos de cabezal.
+        # El orden de presentación no cambia (las listas de hijos se ordenan
+        # por nombre al fusionar).
+        if sys.platform != "win32":
+            entries.sort(key=lambda listed: listed.inode())
+
+        for entry in entries:
+            # Interna la ruta relativa: las mismas cadenas se repiten como
+            # claves en los índices de ambos lados y en los diccionarios de
+            # comparación, así que compartir una sola instancia ahorra
+            # memoria y las búsquedas en dict resuelven por identidad antes
+            # de comparar carácter a carácter.
+            rel_path = sys.intern(rel_prefix + entry.name)
+            # Normalmente el tipo sale del propio listado, pero en montajes
+            # que devuelven DT_UNKNOWN (CIFS/SMB, algunos XFS) is_dir cae a
+            # un stat que puede fallar; en ese caso la entrada se registra
+            # como archivo de tamaño desconocido, igual que hacía os.walk.
+            try:
+                entry_is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                entry_is_dir = False
+            if entry_is_dir:
+                local_paths.append(rel_path)
+                local_types.append(TYPE_DIR)
+                local_sizes.append(SIZE_UNKNOWN)
+                subdirectories.append((entry.path, rel_path + os.sep))
+            else:
+                # El tamaño debe salir de entry.stat(): en Windows y NFS
+                # reutiliza los datos que el listado ya trajo, mientras que
+                # os.path.getsize u os.stat sobre la ruta pagarían un stat
+                # completo extra.
                 try:
-                    size = os.path.getsize(file_path)
+                    size = entry.stat(follow_symlinks=False).st_size
                 except OSError:
-                    size = None
-                entries[rel_path] = {"type": "file", "size": size}
-        return entries
+                    size = SIZE_UNKNOWN
+                local_paths.append(rel_path)
+                local_types.append(TYPE_FILE)
+                local_sizes.append(size)
+        return parent_rel, local_paths, local_types, local_sizes, subdirectories
 
     def _populate_tree(
         self,
         tree: ttk.Treeview,
         base_path: str,
-        entries: dict[str, dict[str, object]],
+        scan: ScanResult,
+        visible: set[str] | None,
         path_store: dict[str, str],
         side: str,
     ) -> None:
-        """Llena el Treeview con las entradas de un solo directorio."""
+        """Llena el Treeview con la raíz y el primer nivel de un directorio.
+
+        El resto de los niveles se inserta bajo demanda cuando el usuario
+        expande una carpeta (ver ``_on_tree_open``); así el costo inicial
+        depende de lo visible y no del total de entradas escaneadas. El
+        índice de hijos viene ya armado desde ``_scan_directory``.
+        """
         tree.delete(*tree.get_children())
 
+        self._lazy_state[side] = (scan, visible)
+        self._pending_children[side].clear()
+
         root_label = os.path.basename(base_path.rstrip(os.sep)) or base_path
-        root_id = tree.insert(
-            "",
-            "end",
-            text=root_label,
-            values=("Seleccionada", "Carpeta", "-"),
-            open=True,
-        )
 
-        parent_ids: dict[str, str] = {"": root_id}
-        path_store.clear()
-        path_store[root_id] = ""
-        sorted_paths = sorted(
-            (path for path in entries if path != ""), key=lambda p: (p.count(os.sep), p)
-        )
+        # Mientras dura la carga en bloque el árbol se saca de la grilla
+        # (grid_remove conserva sus opciones), de modo que Tk no recalcule la
+        # geometría en cada insert; al final se vuelve a mostrar de una vez.
+        tree.grid_remove()
+        try:
+            root_id = tree.insert(
+                "",
+                "end",
+                text=root_label,
+                values=("Seleccionada", "Carpeta", "-"),
+                open=True,
+            )
 
-        for path in sorted_paths:
-            if self.show_differences_only.get() and not self._is_path_relevant(path):
-                continue
+            path_store.clear()
+            path_store[root_id] = ""
+            self._insert_children(tree, side, "", root_id, path_store)
+        finally:
+            tree.grid()
 
-            parent_path = os.path.dirname(path)
-            name = os.path.basename(path)
-            parent_id = parent_ids.get(parent_path, root_id)
+        self._log_debug(
+            lambda: f"Árbol {side}: {len(path_store)} nodos insertados (incluye la raíz)."
+        )
 
-            info = entries[path]
-            item_type = "Carpeta" if info["type"] == "dir" else "Archivo"
+    def _insert_children(
+        self,
+        tree: ttk.Treeview,
+        side: str,
+        parent_path: str,
+        parent_id: str,
+        path_store: dict[str, str],
+        start: int = 0,
+    ) -> None:
+        """Inserta los hijos directos de una carpeta en el árbol indicado.
+
+        Cuando una carpeta tiene más hijos que ``_render_chunk_size`` solo se
+        materializa la primera tanda; el resto queda anotado en
+        ``_pending_children`` y se inserta al avanzar el scroll.
+        """
+
+        scan, visible = self._lazy_state[side]
+        children_index = scan.children_by_parent
+        children = children_index.get(parent_path, [])
+        # Todos los hijos comparten el prefijo "parent_path + os.sep", así que
+        # el nombre se obtiene cortando la ruta en lugar de os.path.basename.
+        name_start = len(parent_path) + len(os.sep) if parent_path else 0
+        # Enlaces locales para evitar búsquedas de atributos por iteración.
+        insert = tree.insert
+        entry_index = scan.index
+        types = scan.types
+        sizes = scan.sizes
+        get_status = self._get_status_for_side
+        chunk_size = self._render_chunk_size
+        inserted = 0
+        for index in range(start, len(children)):
+            if inserted >= chunk_size:
+                self._pending_children[side][parent_id] = index
+                return
+
+            path = children[index]
+            # El conjunto ``visible`` ya viene filtrado desde _refresh_trees;
+            # no hace falta reevaluar la relevancia de cada ruta aquí.
+            if visible is not None and path not in visible:
+                continue
+            position = entry_index[path]
+            is_file = types[position] == TYPE_FILE
+            item_type = "Archivo" if is_file else "Carpeta"
 
-            status = self._get_status_for_side(path, side)
-            if info["type"] == "file":
-                size_value = info.get("size")
-                size_display = f"{size_value} B" if isinstance(size_value, int) else "-"
+            status = get_status(path, side)
+            if is_file and sizes[position] != SIZE_UNKNOWN:
+                size_display = "%d B" % sizes[position]
             else:
                 size_display = "-"
 
-            node_id = tree.insert(
+            node_id = insert(
                 parent_id,
                 "end",
-                text=name,
+                text=path[name_start:],
                 values=(status, item_type, size_display),
                 open=False,
             )
-            parent_ids[path] = node_id
             path_store[node_id] = path
+            inserted += 1
+            if path in children_index:
+                # Hijo ficticio para que Tk muestre la flecha de expansión;
+                # se reemplaza por los hijos reales al abrir la carpeta.
+                insert(node_id, "end", text="…", tags=("placeholder",))
 
-        self._log_debug(
-            f"Árbol {side}: {len(path_store)} nodos insertados (incluye la raíz)."
-        )
-
-    def _get_status_for_side(self, path: str, side: str) -> str:
-        """Devuelve el estado calculado para un elemento en el árbol indicado."""
-
-        data = self.comparison_data.get(path)
-        if not data:
-            return ""
-
-        differs = bool(data.get("differs"))
-        status = data.get(f"status_{side}")
+        self._pending_children[side].pop(parent_id, None)
 
-        if not differs and path in self.difference_paths:
-            return "Contiene diferencias"
+    def _on_tree_scroll(
+        self, tree: ttk.Treeview, scrollbar: ttk.Scrollbar, first: str, last: str
+    ) -> None:
+        """Reenvía el scroll a la barra y materializa filas pendientes."""
 
-        return status if isinstance(status, str) else ""
+        scrollbar.set(first, last)
 
-    def _build_comparison(
-        self,
-        left_entries: dict[str, dict[str, object]],
-        right_entries: dict[str, dict[str, object]],
-    ) -> tuple[dict[str, dict[str, object]], set[str]]:
-        """Compara dos diccionarios de entradas y marca diferencias por ruta."""
-
-        comparison: dict[str, dict[str, object]] = {}
-        differing_paths: set[str] = set()
-        all_paths = set(left_entries) | set(right_entries)
-
-        for path in all_paths:
-            left_info = left_entries.get(path)
-            right_info = right_entries.get(path)
-
-            status_left, status_right, differs = self._determine_status(left_info, right_info)
-            comparison[path] = {
-                "status_left": status_left,
-                "status_right": status_right,
-                "differs": differs,
-            }
+        if float(last) < 0.9:
+            return
+        if tree is self.left_tree:
+            side, path_store = "left", self.left_item_paths
+        elif tree is self.right_tree:
+            side, path_store = "right", self.right_item_paths
+        else:
+            return
 
-            if differs:
-                differing_paths.add(path)
+        pending = self._pending_children[side]
+        if not pending:
+            return
+        parent_id, start = next(iter(pending.items()))
+        del pending[parent_id]
+        parent_path = path_store.get(parent_id)
+        if parent_path is None:
+            return
+        self._insert_children(tree, side, parent_path, parent_id, path_store, start)
 
-        for path in list(differing_paths):
-            parent = self._parent_path(path)
-            while parent is not None:
-                differing_paths.add(parent)
-                parent = self._parent_path(parent)
+    def _on_tree_open(self, event: tk.Event) -> None:
+        """Reemplaza el hijo ficticio por los hijos reales al expandir."""
 
-        sample = sorted(differing_paths)[: self._debug_sample_limit]
-        self._log_debug(
-            f"Comparación calculada: {len(comparison)} rutas evaluadas, "
-            f"{len(differing_paths)} marcadas como relevantes. "
-            f"Ejemplos: {sample}"
-        )
-        return comparison, differing_paths
+        tree = cast(ttk.Treeview, event.widget)
+        if tree is self.left_tree:
+            side, path_store = "left", self.left_item_paths
+        elif tree is self.right_tree:
+            side, path_store = "right", self.right_item_paths
+        else:
+            return
 
-    def _determine_status(
-        self,
-        left_info: dict[str, object] | None,
-        right_info: dict[str, object] | None,
-    ) -> tuple[str, str, bool]:
-        """Calcula el estado de cada lado para una ruta determinada."""
+        node_id = tree.focus()
+        rel_path = path_store.get(node_id)
+        if rel_path is None or side not in self._lazy_state:
+            return
 
-        if left_info and right_info:
-            if left_info["type"] != right_info["type"]:
-                return "Tipo distinto", "Tipo distinto", True
+        children = tree.get_children(node_id)
+        if len(children) != 1 or "placeholder" not in tree.item(children[0], "tags"):
+            return
 
-            # Si existe en ambos lados con el mismo tipo, se considera que coincide
-            # por nombre (tamaño solo se muestra a modo informativo).
-            return "Coincide", "Coincide", False
+        tree.delete(children[0])
+        self._insert_children(tree, side, rel_path, node_id, path_store)
 
-        if left_info:
-            return "Solo izquierda", "No existe", True
+    def _get_status_for_side(self, path: str, side: str) -> str:
+        """Devuelve el estado calculado para un elemento en el árbol indicado."""
 
-        if right_info:
-            return "No existe", "Solo derecha", True
+        # ``comparison_data`` solo guarda las rutas que difieren; cualquier
+        # otra ruta comparada coincide por definición.
+        status_left, status_right, differs = self.comparison_data.get(
+            path, STATUS_MATCH
+        )
 
-        return "", "", False
+        if not differs and path in self.difference_paths:
+            return "Contiene diferencias"
 
-    def _parent_path(self, path: str) -> str | None:
-        """Obtiene la ruta relativa del padre o None cuando es la raíz."""
+        return status_left if side == "left" else status_right
 
-        if not path:
-            return None
+    def _build_comparison(
+        self, left_scan: ScanResult, right_scan: ScanResult
+    ) -> tuple[dict[str, tuple[str, str, bool]], set[str]]:
+        """Compara dos escaneos y marca diferencias por ruta."""
+
+        left_keys = left_scan.index.keys()
+        right_keys = right_scan.index.keys()
+        both_sides = left_keys & right_keys
+        only_left = left_keys - right_keys
+        only_right = right_keys - left_keys
+
+        comparison: dict[str, tuple[str, str, bool]] = {
+            path: STATUS_ONLY_LEFT for path in only_left
+        }
+        comparison.update({path: STATUS_ONLY_RIGHT for path in only_right})
+        differing_paths: set[str] = only_left | only_right
+
+        add_differing = differing_paths.add
+        left_index, left_types = left_scan.index, left_scan.types
+        right_index, right_types = right_scan.index, right_scan.types
+        # Solo se guardan las rutas que difieren: lo que existe en ambos lados
+        # con el mismo tipo coincide por definición (el tamaño solo se muestra
+        # a modo informativo) y se resuelve como STATUS_MATCH al consultar.
+        for path in both_sides:
+            if left_types[left_index[path]] != right_types[right_index[path]]:
+                comparison[path] = STATUS_TYPE_MISMATCH
+                add_differing(path)
+
+        # Propaga las diferencias hacia los ancestros usando los índices de
+        # padres del escaneo; se corta en cuanto un ancestro ya está marcado.
+        left_parents = left_scan.parent_of
+        right_parents = right_scan.parent_of
+        stack = list(differing_paths)
+        while stack:
+            path = stack.pop()
+            parent = left_parents.get(path)
+            if parent is None:
+                parent = right_parents.get(path)
+            if parent is None or parent in differing_paths:
+                continue
+            differing_paths.add(parent)
+            stack.append(parent)
 
-        parent = os.path.dirname(path)
-        return parent if parent != path else None
+        evaluated = len(both_sides) + len(only_left) + len(only_right)
+        self._log_debug(
+            lambda: (
+                f"Comparación calculada: {evaluated} rutas evaluadas, "
+                f"{len(differing_paths)} marcadas como relevantes. "
+                f"Ejemplos: {sorted(differing_paths)[: self._debug_sample_limit]}"
+            )
+        )
+        return comparison, differing_paths
 
     def _clear_debug_log(self) -> None:
         """Borra el cuadro de log de depuración."""
@@ -513,20 +860,48 @@ class FolderComparator(tk.Tk):
         self.debug_text.delete("1.0", tk.END)
         self.debug_text.configure(state="disabled")
 
-    def _log_debug(self, message: str) -> None:
-        """Envía mensajes de depuración al cuadro de texto y a la consola."""
+    def _log_debug(self, message: str | Callable[[], str]) -> None:
+        """Envía mensajes de depuración al cuadro de texto y a la consola.
+
+        Los mensajes se acumulan en un búfer y se vuelcan al widget en un
+        solo ``insert`` cada 100 ms, para no pagar cuatro viajes a Tk por
+        cada línea durante un escaneo grande. Los mensajes costosos de
+        construir pueden pasarse como callables: solo se evalúan cuando la
+        depuración está activada.
+        """
 
-        print(f"[DEBUG] {message}")
         if not self.debug_enabled.get():
             return
 
+        if callable(message):
+            message = message()
+        print(f"[DEBUG] {message}")
+        self._log_buffer.append(message + "\n")
+        if not self._log_pending:
+            self._log_pending = True
+            self.after(100, self._flush_debug_log)
+
+    def _flush_debug_log(self) -> None:
+        """Vuelca el búfer de mensajes pendientes al cuadro de depuración."""
+
+        self._log_pending = False
+        if not self._log_buffer:
+            return
+
+        text = "".join(self._log_buffer)
+        self._log_buffer.clear()
         self.debug_text.configure(state="normal")
-        self.debug_text.insert(tk.END, message + "\n")
+        self.debug_text.insert(tk.END, text)
         self.debug_text.see(tk.END)
         self.debug_text.configure(state="disabled")
 
     def _on_selection_change(self, event: tk.Event) -> None:
-        """Muestra el archivo seleccionado en el panel inferior correspondiente."""
+        """Programa la previsualización del elemento seleccionado.
+
+        La lectura real se difiere 150 ms y se cancela si llega otra
+        selección antes, de modo que navegar con las flechas no dispare una
+        lectura de archivo por cada fila recorrida.
+        """
 
         if not isinstance(event.widget, ttk.Treeview):
             return
@@ -540,6 +915,17 @@ class FolderComparator(tk.Tk):
             return
         selected_id = item_id[0]
 
+        if self._preview_after_id is not None:
+            self.after_cancel(self._preview_after_id)
+        self._preview_after_id = self.after(
+            150, self._show_selected_preview, tree, selected_id
+        )
+
+    def _show_selected_preview(self, tree: ttk.Treeview, selected_id: str) -> None:
+        """Muestra el archivo seleccionado en el panel inferior correspondiente."""
+
+        self._preview_after_id = None
+
         if tree is self.left_tree:
             base_path = self.left_base_path
             path_store = self.left_item_paths
@@ -552,6 +938,12 @@ class FolderComparator(tk.Tk):
         if base_path is None:
             return
 
+        # Toda nueva solicitud sobre el panel invalida las lecturas en vuelo:
+        # si una lectura lenta termina después, su generación ya no coincide
+        # y el resultado se descarta en lugar de pisar la selección actual.
+        generation = self._preview_generations.get(preview, 0) + 1
+        self._preview_generations[preview] = generation
+
         rel_path = path_store.get(selected_id)
         if rel_path is None:
             self._clear_preview(preview)
@@ -562,9 +954,51 @@ class FolderComparator(tk.Tk):
             self._show_message(preview, "Seleccione un archivo para previsualizar su contenido.")
             return
 
+        future = self._io_pool.submit(self._read_preview_content, full_path)
+        future.add_done_callback(
+            lambda done: self.after(
+                0, self._apply_preview_result, preview, done, generation
+            )
+        )
+
+    def _read_preview_content(self, full_path: str) -> str:
+        """Lee el comienzo de un archivo para la previsualización.
+
+        Solo se lee un prefijo acotado: la vista previa nunca muestra más
+        que eso y así abrir un archivo de varios GB es instantáneo. Si los
+        primeros bytes contienen un NUL se asume contenido binario y no se
+        intenta mostrarlo como texto.
+        """
+
+        with open(full_path, "rb") as file:
+            raw = file.read(self._preview_read_limit)
+            truncated = bool(file.read(1))
+
+        if b"\x00" in raw[:4096]:
+            return "(archivo binario: no se muestra la vista previa)"
+
+        content = raw.decode("utf-8", errors="replace")
+        if truncated:
+            content += "\n\n… (archivo truncado en la vista previa)"
+        return content
+
+    def _apply_preview_result(
+        self,
+        preview: scrolledtext.ScrolledText,
+        future: "Future[str]",
+        generation: int,
+    ) -> None:
+        """Vuelca en la UI el resultado de una lectura de previsualización.
+
+        Los resultados de lecturas que ya no corresponden a la última
+        solicitud del panel se descartan sin tocar la UI.
+        """
+
+        if generation != self._preview_generations.get(preview):
+            return
+
         try:
-            with open(full_path, "r", encoding="utf-8", errors="replace") as file:
-                content = file.read()
+            content = future.result()
         except OSError as exc:
             self._show_message(preview, f"No se pudo leer el archivo: {exc}")
             return
@@ -574,6 +1008,10 @@ class FolderComparator(tk.Tk):
     def _clear_preview(self, widget: scrolledtext.ScrolledText) -> None:
         """Limpia el texto de la previsualización."""
 
+        # Limpiar también invalida las lecturas en vuelo del panel.
+        self._preview_generations[widget] = (
+            self._preview_generations.get(widget, 0) + 1
+        )
         self._set_preview_text(widget, "")
 
     def _show_message(self, widget: scrolledtext.ScrolledText, message: str) -> None:
@@ -622,11 +1060,11 @@ class FolderComparator(tk.Tk):
         if not save_path:
             return
 
-        export_data = self._build_export_data(base_path)
+        scan = self._entries_for_export(base_path)
 
         try:
             with open(save_path, "w", encoding="utf-8") as outfile:
-                json.dump(export_data, outfile, ensure_ascii=False, indent=2)
+                self._write_export_json(outfile, base_path, scan)
         except OSError as exc:
             messagebox.showerror("Error al guardar", f"No se pudo guardar el archivo: {exc}")
             return
@@ -636,24 +1074,48 @@ class FolderComparator(tk.Tk):
             f"Se exportó el contenido de la carpeta {label} a:\n{save_path}",
         )
 
-    def _build_export_data(self, base_path: str) -> dict[str, object]:
-        """Prepara la estructura JSON con el contenido de un directorio."""
-
-        entries = self._scan_directory(base_path)
-        export_entries = []
-        for rel_path, info in sorted(entries.items()):
-            export_entries.append(
-                {
-                    "ruta": rel_path or ".",
-                    "tipo": "carpeta" if info["type"] == "dir" else "archivo",
-                    "tamano": info.get("size") if info["type"] == "file" else None,
-                }
-            )
+    def _entries_for_export(self, base_path: str) -> ScanResult:
+        """Obtiene el escaneo a exportar, reutilizando el de la comparación.
 
-        return {
-            "carpeta": base_path,
-            "entradas": export_entries,
-        }
+        Cuando la carpeta a exportar coincide con alguna de las comparadas se
+        devuelve el escaneo en caché, evitando recorrer el disco otra vez.
+        """
+
+        if base_path == self.left_base_path and self._last_left_scan is not None:
+            return self._last_left_scan
+        if base_path == self.right_base_path and self._last_right_scan is not None:
+            return self._last_right_scan
+        return self._scan_directory(base_path)
+
+    def _write_export_json(
+        self, outfile: io.TextIOBase, base_path: str, scan: ScanResult
+    ) -> None:
+        """Escribe el JSON de exportación entrada por entrada.
+
+        Emitir cada entrada a medida que se recorre el escaneo evita
+        materializar una lista intermedia con todas ellas, así el consumo de
+        memoria no depende del tamaño del árbol exportado.
+        """
+
+        outfile.write(
+            '{\n  "carpeta": ' + json.dumps(base_path, ensure_ascii=False)
+            + ',\n  "entradas": [\n'
+        )
+        types, sizes = scan.types, scan.sizes
+        first = True
+        for rel_path, position in sorted(scan.index.items()):
+            is_file = types[position] == TYPE_FILE
+            size = sizes[position]
+            record = {
+                "ruta": rel_path or ".",
+                "tipo": "archivo" if is_file else "carpeta",
+                "tamano": size if is_file and size != SIZE_UNKNOWN else None,
+            }
+            if not first:
+                outfile.write(",\n")
+            first = False
+            outfile.write("    " + json.dumps(record, ensure_ascii=False))
+        outfile.write("\n  ]\n}\n")
 
 
 def main() -> None:
@@ -13,20 +13,53 @@ Uso:
 """
 from __future__ import annotations
 
+import atexit
+import functools
 import os
 import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from typing import Iterable
 import tkinter as tk
 from tkinter import filedialog
 import xml.etree.ElementTree as ET
 
+try:
+    # lxml es opcional: cuando está instalado, la búsqueda del elemento
+    # objetivo se hace con XPath compilado en C en vez de iterar en Python.
+    import lxml.etree as LET
+except ImportError:
+    LET = None
+
+# Errores de parseo que puede levantar el parser activo.
+_XML_PARSE_ERRORS: tuple[type[Exception], ...]
+if LET is not None:
+    _XML_PARSE_ERRORS = (ET.ParseError, LET.XMLSyntaxError)
+else:
+    _XML_PARSE_ERRORS = (ET.ParseError,)
+
 # Nombre de la etiqueta a extraer, configurable si en el futuro se desea buscar
 # otra clave concreta.
 TARGET_TAG = "a:extLst"
 THEME_FILE_NAME = "theme1.xml"
 VARIANT_MANAGER_FILE_NAMES = ["themeVariantManager.xml", "themeVarianManager.xml"]
 
+# Formas en notación de Clark de las etiquetas buscadas, precalculadas para
+# que el bucle caliente compare cadenas internadas en vez de partir
+# element.tag en cada nodo.
+_NS_DRAWINGML = "http://schemas.openxmlformats.org/drawingml/2006/main"
+_NS_THEMEML = "http://schemas.microsoft.com/office/thememl/2012/main"
+_EXTLST_CLARK = f"{{{_NS_DRAWINGML}}}extLst"
+_THEMEFAMILY_CLARK = f"{{{_NS_THEMEML}}}themeFamily"
+_TARGET_TAGS = frozenset({_EXTLST_CLARK, TARGET_TAG, TARGET_TAG.split(":")[-1]})
+
+# Expresiones XPath compiladas una sola vez: evaluar un etree.XPath
+# precompilado evita reanalizar la expresión en cada archivo.
+if LET is not None:
+    _XP_TARGET = LET.XPath(f'//*[local-name()="{TARGET_TAG.split(":")[-1]}"]')
+    _XP_THEMEFAMILY_INNER = LET.XPath('.//*[local-name()="themeFamily"]')
+
 
 @dataclass
 class ThemeFiles:
@@ -36,6 +69,28 @@ class ThemeFiles:
     variant_manager_path: str | None
 
 
+@functools.lru_cache(maxsize=None)
+def _exists(path: str) -> bool:
+    """``os.path.exists`` con caché: el script solo lee, nunca escribe.
+
+    Las rutas candidatas bajo ``base_dir/themeVariants`` se repiten para cada
+    carpeta ``theme/theme`` encontrada, así que los aciertos cambian un
+    ``stat`` por una búsqueda en dict.
+    """
+
+    return os.path.exists(path)
+
+
+def _dir_name_set(path: str) -> set[str]:
+    """Lista una carpeta y devuelve el conjunto de nombres (vacío si falla)."""
+
+    try:
+        with os.scandir(path) as iterator:
+            return {entry.name for entry in iterator}
+    except OSError:
+        return set()
+
+
 def find_theme_files(base_dir: str) -> Iterable[ThemeFiles]:
     """Encuentra rutas a ``theme1.xml`` y ``themeVariantManager.xml`` bajo carpetas ``theme/theme``.
 
@@ -45,29 +100,62 @@ def find_theme_files(base_dir: str) -> Iterable[ThemeFiles]:
     Si no existe en ninguna de ellas, se omite de los resultados.
     """
 
-    for current_root, _, files in os.walk(base_dir):
-        if os.path.basename(current_root) != "theme":
-            continue
-        parent = os.path.basename(os.path.dirname(current_root))
-        if parent != "theme":
+    # Recorrido con os.scandir en lugar de os.walk: el tipo de cada entrada
+    # sale del propio listado (sin stat adicional) y el nombre de la carpeta
+    # se conoce al apilarla, así que no hace falta os.path.basename por nivel.
+    # Además se poda el descenso: por debajo del primer nivel solo interesa
+    # seguir bajando por carpetas llamadas "theme" (o cualquier hija de una
+    # "theme", porque ahí puede estar la "theme" interna). El primer nivel no
+    # se poda para seguir admitiendo una carpeta base que agrupe varios
+    # paquetes (base/paquete/theme/theme).
+    # Los candidatos bajo base_dir/themeVariants son los mismos para todos
+    # los temas: se listan una sola vez.
+    base_variants_dir = os.path.join(base_dir, "themeVariants")
+    base_variant_names = _dir_name_set(base_variants_dir)
+
+    pending: list[tuple[str, str, str, bool]] = [
+        (base_dir, os.path.basename(base_dir.rstrip(os.sep)), "", False)
+    ]
+    while pending:
+        current_root, current_name, parent_name, prunable = pending.pop()
+        subdirectories: list[tuple[str, str, str, bool]] = []
+        file_names: set[str] = set()
+        try:
+            with os.scandir(current_root) as iterator:
+                for entry in iterator:
+                    if entry.is_dir(follow_symlinks=False):
+                        if prunable and current_name != "theme" and entry.name != "theme":
+                            continue
+                        subdirectories.append((entry.path, entry.name, current_name, True))
+                    else:
+                        file_names.add(entry.name)
+        except OSError:
             continue
 
-        if THEME_FILE_NAME not in files:
+        if current_name != "theme" or parent_name != "theme" or THEME_FILE_NAME not in file_names:
+            pending.extend(subdirectories)
             continue
 
         theme_path = os.path.join(current_root, THEME_FILE_NAME)
-        candidate_paths = [
-            os.path.join(current_root, "themeVariants", file_name)
-            for file_name in VARIANT_MANAGER_FILE_NAMES
-        ] + [
-            os.path.join(current_root, file_name)
-            for file_name in VARIANT_MANAGER_FILE_NAMES
-        ] + [
-            os.path.join(base_dir, "themeVariants", file_name)
-            for file_name in VARIANT_MANAGER_FILE_NAMES
-        ]
-
-        variant_manager_path = next((path for path in candidate_paths if os.path.exists(path)), None)
+
+        # La existencia de cada candidato se decide contra conjuntos de
+        # nombres ya listados (la propia carpeta del tema sale del listado
+        # del recorrido), en vez de un stat por ruta candidata.
+        variants_dir = os.path.join(current_root, "themeVariants")
+        search_order = (
+            (variants_dir, _dir_name_set(variants_dir)),
+            (current_root, file_names),
+            (base_variants_dir, base_variant_names),
+        )
+        variant_manager_path = next(
+            (
+                os.path.join(directory, file_name)
+                for directory, names in search_order
+                for file_name in VARIANT_MANAGER_FILE_NAMES
+                if file_name in names
+            ),
+            None,
+        )
         yield ThemeFiles(
             theme_path=theme_path,
             variant_manager_path=variant_manager_path,
@@ -75,39 +163,127 @@ def find_theme_files(base_dir: str) -> Iterable[ThemeFiles]:
 
 
 def get_target_elements(file_path: str) -> list[str]:
-    """Carga un ``theme1.xml`` y devuelve el contenido de ``TARGET_TAG``."""
+    """Recorre un ``theme1.xml`` y devuelve el contenido de ``TARGET_TAG``.
+
+    Con lxml instalado se usa XPath ejecutado en C; si no, el archivo se
+    procesa en streaming con ``ET.iterparse`` en lugar de materializar el
+    árbol completo con ``ET.parse``: solo se conserva el subárbol del
+    elemento buscado mientras se arma y todo lo demás se libera con
+    ``clear()`` apenas termina, acotando la memoria pico.
+    """
+
+    if LET is not None:
+        return _get_target_elements_lxml(file_path)
+
+    matches: list[str] = []
+    depth_in_target = 0
 
     try:
-        tree = ET.parse(file_path)
+        for event, element in ET.iterparse(file_path, events=("start", "end")):
+            if event == "start":
+                # Comparación directa contra el conjunto precalculado: sin
+                # split ni cadena intermedia por nodo.
+                if depth_in_target or element.tag in _TARGET_TAGS:
+                    depth_in_target += 1
+                continue
+
+            if not depth_in_target:
+                # Elemento fuera del objetivo: su subárbol ya no interesa.
+                element.clear()
+                continue
+
+            depth_in_target -= 1
+            if depth_in_target:
+                continue
+
+            # Fin del elemento objetivo más externo: su subárbol está
+            # completo. iter() lo recorre en orden de documento e incluye al
+            # propio elemento, así que los objetivos anidados dentro de él
+            # también se emiten, igual que con el XPath del camino lxml.
+            for target in element.iter():
+                if target.tag not in _TARGET_TAGS:
+                    continue
+                theme_family = next(target.iter(_THEMEFAMILY_CLARK), None)
+                if theme_family is not None:
+                    matches.append(ET.tostring(theme_family, encoding="unicode"))
+                else:
+                    matches.append(ET.tostring(target, encoding="unicode"))
+            element.clear()
     except ET.ParseError as exc:
         raise SystemExit(f"No se pudo parsear {file_path}: {exc}") from exc
 
-    root = tree.getroot()
-    matches: list[str] = []
-    target_tag_plain = TARGET_TAG.split(":")[-1]
+    return matches
 
-    for element in root.iter():
-        tag_without_ns = element.tag.split("}", maxsplit=1)[-1]
-        if tag_without_ns not in (TARGET_TAG, target_tag_plain):
-            continue
 
-        theme_family = next(
-            (
-                child
-                for child in element.iter()
-                if child.tag.split("}", maxsplit=1)[-1] == "themeFamily"
-            ),
-            None,
-        )
+def _get_target_elements_lxml(file_path: str) -> list[str]:
+    """Variante de ``get_target_elements`` basada en XPath de lxml.
 
-        if theme_family is not None:
-            matches.append(ET.tostring(theme_family, encoding="unicode"))
-        else:
-            matches.append(ET.tostring(element, encoding="unicode"))
+    ``local-name()`` replica la comparación de etiquetas sin espacio de
+    nombres del recorrido en Python, por lo que ambos caminos devuelven lo
+    mismo.
+    """
 
+    root = _parse_xml_root(file_path)
+
+    matches: list[str] = []
+    for element in _XP_TARGET(root):
+        families = _XP_THEMEFAMILY_INNER(element)
+        if families:
+            matches.append(LET.tostring(families[0], encoding="unicode"))
+        else:
+            matches.append(LET.tostring(element, encoding="unicode"))
     return matches
 
 
+# Raíces ya parseadas, por (ruta, mtime_ns): el flujo normal parsea el mismo
+# theme1.xml varias veces seguidas (contenidos y familias), y la clave con
+# mtime invalida sola si el archivo cambió entre llamadas.
+_parse_cache: dict[tuple[str, int], object] = {}
+
+
+def _parse_xml_root(file_path: str):
+    """Parsea un XML y devuelve su raíz, con lxml cuando está disponible.
+
+    libxml2 parsea en C varias veces más rápido que ElementTree; la API de
+    los elementos devueltos es compatible para lo que este script usa
+    (``iter``, ``get``, ``tostring``). Un XML mal formado corta la ejecución
+    con el mismo mensaje en ambos casos. Las raíces se memorizan por ruta y
+    mtime, así que visitas repetidas cuestan un ``stat`` y una búsqueda.
+    """
+
+    key = (file_path, os.stat(file_path).st_mtime_ns)
+    root = _parse_cache.get(key)
+    if root is not None:
+        return root
+
+    if LET is not None:
+        try:
+            root = LET.parse(file_path).getroot()
+        except LET.XMLSyntaxError as exc:
+            raise SystemExit(f"No se pudo parsear {file_path}: {exc}") from exc
+    else:
+        try:
+            root = ET.parse(file_path).getroot()
+        except ET.ParseError as exc:
+            raise SystemExit(f"No se pudo parsear {file_path}: {exc}") from exc
+
+    _parse_cache[key] = root
+    return root
+
+
+def _iter_by_tag(root, wildcard_tag: str):
+    """Itera los descendientes cuyo tag coincide, con el filtro en C.
+
+    ``wildcard_tag`` usa el comodín de espacio de nombres (``{*}nombre``).
+    lxml lo acepta directamente en ``iter``; ElementTree solo lo admite en
+    ``iterfind``, así que se elige según el parser activo.
+    """
+
+    if LET is not None:
+        return root.iter(wildcard_tag)
+    return root.iterfind(f".//{wildcard_tag}")
+
+
 def extract_theme_families(file_path: str) -> list[dict[str, str | None]]:
     """Extrae los valores de ``<themeFamily>`` de un ``theme1.xml``.
 
@@ -115,19 +291,13 @@ def extract_theme_families(file_path: str) -> list[dict[str, str | None]]:
     validar coincidencias con ``themeVariantManager.xml``.
     """
 
-    try:
-        tree = ET.parse(file_path)
-    except ET.ParseError as exc:
-        raise SystemExit(f"No se pudo parsear {file_path}: {exc}") from exc
-
-    root = tree.getroot()
+    root = _parse_xml_root(file_path)
     families: list[dict[str, str | None]] = []
 
-    for element in root.iter():
-        tag_without_ns = element.tag.split("}", maxsplit=1)[-1]
-        if tag_without_ns != "themeFamily":
-            continue
-
+    # Filtrado por etiqueta con comodín de espacio de nombres: corre en C y
+    # el bucle de Python solo ve los nodos que interesan, sin partir
+    # element.tag a mano.
+    for element in _iter_by_tag(root, "{*}themeFamily"):
         families.append(
             {
                 "name": element.get("name"),
@@ -143,19 +313,10 @@ def extract_theme_families(file_path: str) -> list[dict[str, str | None]]:
 def extract_variant_vids(file_path: str) -> list[dict[str, str | None]]:
     """Obtiene los ``vid`` de ``<themeVariant>`` en ``themeVariantManager.xml``."""
 
-    try:
-        tree = ET.parse(file_path)
-    except ET.ParseError as exc:
-        raise SystemExit(f"No se pudo parsear {file_path}: {exc}") from exc
-
-    root = tree.getroot()
+    root = _parse_xml_root(file_path)
     variants: list[dict[str, str | None]] = []
 
-    for element in root.iter():
-        tag_without_ns = element.tag.split("}", maxsplit=1)[-1]
-        if tag_without_ns != "themeVariant":
-            continue
-
+    for element in _iter_by_tag(root, "{*}themeVariant"):
         variants.append(
             {
                 "name": element.get("name"),
@@ -167,15 +328,27 @@ def extract_variant_vids(file_path: str) -> list[dict[str, str | None]]:
     return variants
 
 
-def resolve_relationship_target(rels_path: str, target: str, package_root: str | None) -> str:
-    """Resuelve un ``Target`` de relaciones a una ruta absoluta en disco."""
+def parse_theme_file(theme_path: str) -> tuple[list[str], list[dict[str, str | None]]]:
+    """Extrae contenidos y familias de un ``theme1.xml`` en un solo trabajo.
 
-    rels_dir = os.path.dirname(rels_path)
+    Función de módulo pura (ruta -> resultados) para poder repartir el
+    análisis de muchos temas entre procesos con ``ProcessPoolExecutor``.
+    """
 
+    return get_target_elements(theme_path), extract_theme_families(theme_path)
+
+
+def _relationship_base_dir(rels_path: str) -> str:
+    """Carpeta desde la que se resuelven los ``Target`` de un ``.rels``."""
+
+    rels_dir = os.path.dirname(rels_path)
     if rels_dir.endswith("_rels"):
-        base_dir = os.path.dirname(rels_dir)
-    else:
-        base_dir = rels_dir
+        return os.path.dirname(rels_dir)
+    return rels_dir
+
+
+def _resolve_target_from_base(base_dir: str, target: str, package_root: str | None) -> str:
+    """Resuelve un ``Target`` contra una carpeta base ya calculada."""
 
     if target.startswith("/"):
         if package_root:
@@ -185,6 +358,12 @@ def resolve_relationship_target(rels_path: str, target: str, package_root: str |
     return os.path.normpath(os.path.join(base_dir, target))
 
 
+def resolve_relationship_target(rels_path: str, target: str, package_root: str | None) -> str:
+    """Resuelve un ``Target`` de relaciones a una ruta absoluta en disco."""
+
+    return _resolve_target_from_base(_relationship_base_dir(rels_path), target, package_root)
+
+
 def validate_variant_manager_links(variant_manager_path: str, package_root: str) -> None:
     """Comprueba que los ``Relationship`` de ``themeVariantManager.xml`` apunten a archivos existentes."""
 
@@ -195,39 +374,67 @@ def validate_variant_manager_links(variant_manager_path: str, package_root: str)
     )
 
     print("\nVerificación de vínculos de themeVariantManager.xml")
-    if not os.path.exists(rels_path):
+    if not _exists(rels_path):
         print("No se encontró el archivo de relaciones correspondiente.")
         return
 
+    # El archivo se procesa en streaming: cada Relationship se valida al
+    # cerrarse su etiqueta y se libera con clear(), sin materializar el árbol
+    # completo en memoria.
+    relationship_tag = "{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"
+    # La carpeta base es la misma para todas las relaciones del archivo: se
+    # calcula una sola vez fuera del bucle.
+    rels_base_dir = _relationship_base_dir(rels_path)
+    found_any = False
     try:
-        tree = ET.parse(rels_path)
-    except ET.ParseError as exc:
+        if LET is not None:
+            iterator = LET.iterparse(rels_path, events=("end",), tag=relationship_tag)
+        else:
+            iterator = ET.iterparse(rels_path, events=("end",))
+        for _, element in iterator:
+            if element.tag == relationship_tag:
+                found_any = True
+                rel_id = element.get("Id", "(sin Id)")
+                target = element.get("Target")
+
+                if not target:
+                    print(f"[ADVERTENCIA] La relación {rel_id} no tiene atributo Target.")
+                else:
+                    resolved = _resolve_target_from_base(rels_base_dir, target, package_root)
+                    if _exists(resolved):
+                        print(f"[OK] {rel_id}: archivo encontrado en {resolved}")
+                    else:
+                        print(f"[ERROR] {rel_id}: el archivo referenciado no existe ({resolved})")
+            element.clear()
+    except _XML_PARSE_ERRORS as exc:
         print(f"No se pudo parsear {rels_path}: {exc}")
         return
 
-    root = tree.getroot()
-    relationships = root.findall(".//{http://schemas.openxmlformats.org/package/2006/relationships}Relationship")
-
-    if not relationships:
+    if not found_any:
         print("No se encontraron relaciones en el archivo.")
-        return
 
-    for relationship in relationships:
-        rel_id = relationship.get("Id", "(sin Id)")
-        target = relationship.get("Target")
 
-        if not target:
-            print(f"[ADVERTENCIA] La relación {rel_id} no tiene atributo Target.")
-            continue
+def index_theme_families(
+    theme_families: list[dict[str, str | None]],
+) -> tuple[dict[str | None, list[dict[str, str | None]]], dict[str | None, list[str]]]:
+    """Construye en una sola pasada los índices por ``vid`` y por ``id``.
 
-        resolved = resolve_relationship_target(rels_path, target, package_root)
-        if os.path.exists(resolved):
-            print(f"[OK] {rel_id}: archivo encontrado en {resolved}")
-        else:
-            print(f"[ERROR] {rel_id}: el archivo referenciado no existe ({resolved})")
+    Ambas validaciones agrupan las mismas familias; indexarlas juntas evita
+    recorrer la lista dos veces.
+    """
 
+    family_by_vid: defaultdict[str | None, list[dict[str, str | None]]] = defaultdict(list)
+    sources_by_id: defaultdict[str | None, list[str]] = defaultdict(list)
+    for family in theme_families:
+        family_by_vid[family.get("vid")].append(family)
+        sources_by_id[family.get("id")].append(family.get("source") or "(origen desconocido)")
+    return family_by_vid, sources_by_id
 
-def validate_variant_vids(variants: list[dict[str, str | None]], theme_families: list[dict[str, str | None]]) -> None:
+
+def validate_variant_vids(
+    variants: list[dict[str, str | None]],
+    family_by_vid: dict[str | None, list[dict[str, str | None]]],
+) -> None:
     """Valida que cada ``vid`` de ``themeVariantManager.xml`` exista de forma única en los temas."""
 
     print("\nVerificación de correspondencia de VID entre themeVariantManager.xml y los themes")
@@ -236,10 +443,6 @@ def validate_variant_vids(variants: list[dict[str, str | None]], theme_families:
         print("No se encontraron entradas de themeVariant para validar.")
         return
 
-    family_by_vid: dict[str | None, list[dict[str, str | None]]] = {}
-    for family in theme_families:
-        family_by_vid.setdefault(family.get("vid"), []).append(family)
-
     for variant in variants:
         vid = variant.get("vid")
         linked_families = family_by_vid.get(vid, [])
@@ -259,20 +462,15 @@ def validate_variant_vids(variants: list[dict[str, str | None]], theme_families:
         )
 
 
-def validate_theme_ids(theme_families: list[dict[str, str | None]]) -> None:
+def validate_theme_ids(sources_by_id: dict[str | None, list[str]]) -> None:
     """Comprueba que todos los ``id`` de ``themeFamily`` sean iguales entre sí."""
 
     print("\nVerificación de ID entre todos los theme1.xml")
 
-    if not theme_families:
+    if not sources_by_id:
         print("No se encontraron entradas de themeFamily para validar.")
         return
 
-    sources_by_id: dict[str | None, list[str]] = {}
-    for family in theme_families:
-        theme_id = family.get("id")
-        sources_by_id.setdefault(theme_id, []).append(family.get("source") or "(origen desconocido)")
-
     if len(sources_by_id) == 1:
         only_id = next(iter(sources_by_id))
         print(f"[OK] Todos los theme1.xml comparten el mismo id: {only_id}")
@@ -284,25 +482,51 @@ def validate_theme_ids(theme_families: list[dict[str, str | None]]) -> None:
 
 
 def read_xml_as_string(file_path: str) -> str:
-    """Devuelve el XML completo del archivo indicado como cadena legible."""
+    """Devuelve el XML completo del archivo indicado como cadena legible.
+
+    El contenido se imprime tal cual, así que no hace falta parsear y
+    reserializar: se leen los bytes del archivo y se decodifican.
+    """
+
+    with open(file_path, "rb") as file:
+        return file.read().decode("utf-8", errors="replace")
+
+
+# Raíz de Tk oculta, creada a demanda y compartida por todos los diálogos:
+# inicializar Tcl/Tk es caro y no tiene sentido pagar uno por llamada.
+_TK_ROOT: tk.Tk | None = None
 
-    try:
-        tree = ET.parse(file_path)
-    except ET.ParseError as exc:
-        raise SystemExit(f"No se pudo parsear {file_path}: {exc}") from exc
 
-    return ET.tostring(tree.getroot(), encoding="unicode")
+def _tk_root() -> tk.Tk:
+    """Devuelve la raíz de Tk oculta, creándola en el primer uso."""
+
+    global _TK_ROOT
+    if _TK_ROOT is None:
+        _TK_ROOT = tk.Tk()
+        _TK_ROOT.withdraw()
+        # La destrucción queda diferida al cierre del proceso para no dejar
+        # el intérprete Tcl colgando si hay varias llamadas.
+        atexit.register(_TK_ROOT.destroy)
+    return _TK_ROOT
 
 
 def select_base_dir() -> str | None:
     """Abre un diálogo para seleccionar la carpeta base."""
 
-    root = tk.Tk()
-    root.withdraw()
+    _tk_root()
     return filedialog.askdirectory(title="Selecciona la carpeta raíz de búsqueda")
 
 
 def main() -> int:
+    # En una terminal stdout va con buffer por línea: cada print paga un
+    # write. Con buffer por bloques los cientos de líneas de reporte se
+    # vuelcan en unas pocas escrituras; el flush final está garantizado al
+    # cerrar el intérprete.
+    try:
+        sys.stdout.reconfigure(line_buffering=False, write_through=False)
+    except (AttributeError, ValueError):
+        pass  # stdout redirigido o reemplazado: se deja como está.
+
     base_dir = select_base_dir()
     if not base_dir:
         print("No se seleccionó ninguna carpeta.", file=sys.stderr)
@@ -312,13 +536,27 @@ def main() -> int:
         print(f"La ruta seleccionada no es una carpeta válida: {base_dir}", file=sys.stderr)
         return 1
 
-    found = False
     variant_manager_path: str | None = None
     all_theme_families: list[dict[str, str | None]] = []
-    for theme_files in find_theme_files(base_dir):
-        found = True
-        contents = get_target_elements(theme_files.theme_path)
-        all_theme_families.extend(extract_theme_families(theme_files.theme_path))
+
+    # Se reúnen primero todas las rutas y el análisis XML (que es trabajo de
+    # CPU puro) se reparte entre procesos; la impresión queda en el proceso
+    # principal para conservar el orden de salida.
+    theme_file_list = list(find_theme_files(base_dir))
+    found = bool(theme_file_list)
+    parsed: list[tuple[list[str], list[dict[str, str | None]]]] = []
+    if theme_file_list:
+        with ProcessPoolExecutor() as executor:
+            parsed = list(
+                executor.map(
+                    parse_theme_file,
+                    [theme_files.theme_path for theme_files in theme_file_list],
+                    chunksize=8,
+                )
+            )
+
+    for theme_files, (contents, families) in zip(theme_file_list, parsed):
+        all_theme_families.extend(families)
         if not contents:
             print(
                 f"Tema sin {TARGET_TAG}: {theme_files.theme_path}",
@@ -337,13 +575,15 @@ def main() -> int:
         print("Contenido de themeVariantManager.xml:")
         print(read_xml_as_string(variant_manager_path))
 
+        family_by_vid, sources_by_id = index_theme_families(all_theme_families)
         variants = extract_variant_vids(variant_manager_path)
-        validate_variant_vids(variants, all_theme_families)
+        validate_variant_vids(variants, family_by_vid)
         validate_variant_manager_links(variant_manager_path, base_dir)
-        validate_theme_ids(all_theme_families)
+        validate_theme_ids(sources_by_id)
     else:
         print("No se encontró themeVariantManager.xml en la carpeta.")
-        validate_theme_ids(all_theme_families)
+        _, sources_by_id = index_theme_families(all_theme_families)
+        validate_theme_ids(sources_by_id)
     return 0
 
 
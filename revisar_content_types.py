@@ -6,119 +6,248 @@ cuente con sus atributos requeridos y que todos los PartName referenciados
 apuntan a archivos existentes dentro del paquete.
 """
 
+import functools
 import os
+import sys
 import xml.etree.ElementTree as ET
 from tkinter import Tk, filedialog
 
+try:
+    # lxml es opcional: su iterparse corre en C (libxml2) y filtra por
+    # etiqueta sin pasar cada nodo por Python.
+    import lxml.etree as LET
+except ImportError:
+    LET = None
+
+# Errores de parseo que puede levantar el parser activo.
+_XML_PARSE_ERRORS: tuple[type[Exception], ...]
+if LET is not None:
+    _XML_PARSE_ERRORS = (ET.ParseError, LET.XMLSyntaxError)
+else:
+    _XML_PARSE_ERRORS = (ET.ParseError,)
+
 
 NS_TYPES = "{http://schemas.openxmlformats.org/package/2006/content-types}"
 
+# Rutas de búsqueda precalculadas para no reconstruirlas en cada llamada.
+DEFAULT_PATH = f"{NS_TYPES}Default"
+OVERRIDE_PATH = f"{NS_TYPES}Override"
 
-def resolve_part_path(base_dir: str, part_name: str) -> str:
-    """Convierte un PartName en una ruta absoluta dentro del paquete."""
-    normalized = part_name.lstrip("/\\")
-    return os.path.normpath(os.path.join(base_dir, normalized))
+# Los errores se acumulan como tuplas (codigo, *datos) y solo se convierten
+# en texto cuando efectivamente se muestran; así el camino sin verbose no
+# paga el formateo y quien consume la lista puede filtrar por código.
+ERROR_FORMATS = {
+    "XML_INVALIDO": "[ERROR XML] Archivo mal formado: {0}",
+    "DEFAULT_SIN_EXTENSION": "[ERROR] El elemento <Default> no tiene atributo Extension.",
+    "EXTENSION_DUPLICADA": "[ERROR] Extension duplicada: {0}",
+    "DEFAULT_SIN_CONTENT_TYPE": "[ERROR] El elemento <Default> no tiene atributo ContentType.",
+    "OVERRIDE_SIN_PARTNAME": "[ERROR] El elemento <Override> no tiene atributo PartName.",
+    "PARTNAME_DUPLICADO": "[ERROR] PartName duplicado: {0}",
+    "PARTE_INEXISTENTE": "[ERROR] El archivo referenciado NO existe: {0}",
+    "OVERRIDE_SIN_CONTENT_TYPE": "[ERROR] El elemento <Override> no tiene atributo ContentType.",
+}
 
 
-def validate_content_types(path: str, base_dir: str) -> list[str]:
-    print(f"\n[INFO] Iniciando validación del archivo: {os.path.basename(path)}")
+def format_error(error: tuple[str, ...]) -> str:
+    """Convierte una tupla ``(codigo, *datos)`` en su mensaje imprimible."""
+    return ERROR_FORMATS[error[0]].format(*error[1:])
 
-    errors: list[str] = []
 
-    print("[CHECK] Verificando si el XML está bien formado...")
-    try:
-        tree = ET.parse(path)
-        print("[OK] XML bien formado.")
-    except ET.ParseError as exc:
-        message = f"[ERROR XML] Archivo mal formado: {exc}"
-        print(message)
-        errors.append(message)
-        return errors
+# Marcadores que obligan a pasar por normpath: "..", separadores dobles,
+# segmentos "." y barras invertidas (en Windows normpath además cambia el
+# separador, así que cualquier ruta con "\\" toma el camino lento).
+_NORMPATH_MARKERS = ("..", "./", "//", "\\")
+
+_POSIX_SEP = os.sep == "/"
 
-    root = tree.getroot()
 
-    defaults = root.findall(f"{NS_TYPES}Default")
-    overrides = root.findall(f"{NS_TYPES}Override")
+# La resolución es pura manipulación de strings y los PartName duplicados
+# se vuelven a resolver al reportarse, así que el resultado se memoriza.
+@functools.lru_cache(maxsize=8192)
+def resolve_part_path(base_dir: str, part_name: str) -> str:
+    """Convierte un PartName en una ruta absoluta dentro del paquete."""
+    normalized = part_name.lstrip("/\\")
+    joined = os.path.join(base_dir, normalized)
+    # Camino rápido: los PartName típicos ("/ppt/tema.xml") ya quedan
+    # normalizados con el join y normpath solo repetiría el análisis.
+    if (
+        _POSIX_SEP
+        and not any(marker in joined for marker in _NORMPATH_MARKERS)
+        and not joined.endswith(("/", "/."))
+    ):
+        return joined
+    return os.path.normpath(joined)
+
+
+def collect_package_files(base_dir: str) -> set[str]:
+    """Recorre el paquete una sola vez y devuelve las rutas de sus archivos.
+
+    Con el conjunto en memoria, comprobar cada PartName referenciado es una
+    búsqueda en un set en lugar de un stat por elemento <Override>. Las rutas
+    se guardan con normcase para que la búsqueda respete la comparación sin
+    distinción de mayúsculas de Windows (igual que os.path.exists en NTFS y
+    que la comparación de PartName según la especificación OPC).
+    """
+
+    files: set[str] = set()
+    pending = [base_dir]
+    while pending:
+        current = pending.pop()
+        try:
+            with os.scandir(current) as iterator:
+                for entry in iterator:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    else:
+                        files.add(os.path.normcase(os.path.normpath(entry.path)))
+        except OSError:
+            continue
+    return files
+
+
+def validate_content_types(path: str, base_dir: str, verbose: bool = False) -> list[tuple[str, ...]]:
+    # Con verbose=False solo se imprime el resumen: los print por elemento
+    # dominan el tiempo en archivos [Content_Types].xml con miles de partes.
+    log = print if verbose else _no_log
+
+    log(f"\n[INFO] Iniciando validación del archivo: {os.path.basename(path)}")
+
+    errors: list[tuple[str, ...]] = []
+
+    # El XML se procesa en streaming: de cada elemento se extraen solo los
+    # atributos necesarios al cerrarse su etiqueta y el nodo se libera con
+    # clear(), así la memoria pico no depende del tamaño del documento.
+    log("[CHECK] Verificando si el XML está bien formado...")
+    defaults: list[tuple[str | None, str | None]] = []
+    overrides: list[tuple[str | None, str | None]] = []
+    try:
+        if LET is not None:
+            events = LET.iterparse(path, events=("end",), tag=(DEFAULT_PATH, OVERRIDE_PATH))
+        else:
+            events = ET.iterparse(path, events=("end",))
+        for _, element in events:
+            if element.tag == DEFAULT_PATH:
+                defaults.append((element.get("Extension"), element.get("ContentType")))
+            elif element.tag == OVERRIDE_PATH:
+                overrides.append((element.get("PartName"), element.get("ContentType")))
+            element.clear()
+        log("[OK] XML bien formado.")
+    except _XML_PARSE_ERRORS as exc:
+        error = ("XML_INVALIDO", str(exc))
+        errors.append(error)
+        if verbose:
+            print(format_error(error))
+        _print_summary(path, errors, verbose)
+        return errors
 
-    print(f"[INFO] Se encontraron {len(defaults)} elementos <Default> y {len(overrides)} elementos <Override>.")
+    # Un único recorrido del paquete reemplaza el stat por PartName.
+    package_files = collect_package_files(base_dir)
 
-    print("\n[INFO] Validando elementos <Default>...")
+    log("\n[INFO] Validando elementos <Default>...")
+    total_defaults = 0
     extensions_seen: set[str] = set()
-    for idx, default in enumerate(defaults, start=1):
-        print(f"\n--- Verificando <Default> #{idx} ---")
-        extension = default.get("Extension")
-        content_type = default.get("ContentType")
+    for idx, (extension, content_type) in enumerate(defaults, start=1):
+        total_defaults = idx
+        log(f"\n--- Verificando <Default> #{idx} ---")
 
         if not extension:
-            msg = "[ERROR] El elemento <Default> no tiene atributo Extension."
-            print(msg)
-            errors.append(msg)
+            error = ("DEFAULT_SIN_EXTENSION",)
+            errors.append(error)
+            if verbose:
+                print(format_error(error))
         else:
-            print(f"[OK] Extension presente: {extension}")
-            if extension in extensions_seen:
-                msg = f"[ERROR] Extension duplicada: {extension}"
-                print(msg)
-                errors.append(msg)
+            log(f"[OK] Extension presente: {extension}")
+            # add() detecta el duplicado en una sola búsqueda en el set:
+            # si el tamaño no cambió, la Extension ya estaba.
+            before = len(extensions_seen)
+            extensions_seen.add(extension)
+            if len(extensions_seen) == before:
+                error = ("EXTENSION_DUPLICADA", extension)
+                errors.append(error)
+                if verbose:
+                    print(format_error(error))
             else:
-                extensions_seen.add(extension)
-                print("[OK] Extension es única.")
+                log("[OK] Extension es única.")
 
         if not content_type:
-            msg = "[ERROR] El elemento <Default> no tiene atributo ContentType."
-            print(msg)
-            errors.append(msg)
+            error = ("DEFAULT_SIN_CONTENT_TYPE",)
+            errors.append(error)
+            if verbose:
+                print(format_error(error))
         else:
-            print(f"[OK] ContentType presente: {content_type}")
+            log(f"[OK] ContentType presente: {content_type}")
 
-    print("\n[INFO] Validando elementos <Override>...")
+    log(f"\n[INFO] Se validaron {total_defaults} elementos <Default>.")
+
+    log("\n[INFO] Validando elementos <Override>...")
+    total_overrides = 0
     partnames_seen: set[str] = set()
-    for idx, override in enumerate(overrides, start=1):
-        print(f"\n--- Verificando <Override> #{idx} ---")
-        part_name = override.get("PartName")
-        content_type = override.get("ContentType")
+    for idx, (part_name, content_type) in enumerate(overrides, start=1):
+        total_overrides = idx
+        log(f"\n--- Verificando <Override> #{idx} ---")
 
         if not part_name:
-            msg = "[ERROR] El elemento <Override> no tiene atributo PartName."
-            print(msg)
-            errors.append(msg)
+            error = ("OVERRIDE_SIN_PARTNAME",)
+            errors.append(error)
+            if verbose:
+                print(format_error(error))
         else:
-            print(f"[OK] PartName presente: {part_name}")
-            if part_name in partnames_seen:
-                msg = f"[ERROR] PartName duplicado: {part_name}"
-                print(msg)
-                errors.append(msg)
+            log(f"[OK] PartName presente: {part_name}")
+            before = len(partnames_seen)
+            partnames_seen.add(part_name)
+            if len(partnames_seen) == before:
+                error = ("PARTNAME_DUPLICADO", part_name)
+                errors.append(error)
+                if verbose:
+                    print(format_error(error))
             else:
-                partnames_seen.add(part_name)
-                print("[OK] PartName es único.")
+                log("[OK] PartName es único.")
 
             resolved_path = resolve_part_path(base_dir, part_name)
-            print(f"[CHECK] Verificando existencia del archivo: {resolved_path}")
+            log(f"[CHECK] Verificando existencia del archivo: {resolved_path}")
 
-            if os.path.exists(resolved_path):
-                print("[OK] El archivo referenciado SÍ existe.")
+            # normcase en ambos lados: el índice ya está en normcase.
+            if os.path.normcase(resolved_path) in package_files:
+                log("[OK] El archivo referenciado SÍ existe.")
             else:
-                msg = f"[ERROR] El archivo referenciado NO existe: {resolved_path}"
-                print(msg)
-                errors.append(msg)
+                error = ("PARTE_INEXISTENTE", resolved_path)
+                errors.append(error)
+                if verbose:
+                    print(format_error(error))
 
         if not content_type:
-            msg = "[ERROR] El elemento <Override> no tiene atributo ContentType."
-            print(msg)
-            errors.append(msg)
+            error = ("OVERRIDE_SIN_CONTENT_TYPE",)
+            errors.append(error)
+            if verbose:
+                print(format_error(error))
         else:
-            print(f"[OK] ContentType presente: {content_type}")
+            log(f"[OK] ContentType presente: {content_type}")
+
+    log(f"\n[INFO] Se validaron {total_overrides} elementos <Override>.")
 
+    _print_summary(path, errors, verbose)
+    return errors
+
+
+def _no_log(*args: object, **kwargs: object) -> None:
+    pass
+
+
+def _print_summary(path: str, errors: list[tuple[str, ...]], verbose: bool) -> None:
     print("\n===========================================")
-    print("[RESULTADO FINAL]")
+    print(f"[RESULTADO FINAL] {os.path.basename(path)}")
 
     if not errors:
         print("[OK] No se encontraron errores en este archivo.")
-        errors.append("[OK] No se encontraron errores.")
     else:
         print(f"[ERRORES] Se encontraron {len(errors)} problema(s).")
+        if not verbose:
+            # Sin detalle por elemento, los errores acumulados se listan acá
+            # para que sigan siendo visibles.
+            for error in errors:
+                print(f"  {format_error(error)}")
 
     print("===========================================\n")
-    return errors
 
 
 def main() -> None:
@@ -142,7 +271,8 @@ def main() -> None:
         print("No se seleccionó ningún archivo. Operación cancelada.")
         return
 
-    validate_content_types(xml_path, base_dir)
+    verbose = "--verbose" in sys.argv or "-v" in sys.argv
+    validate_content_types(xml_path, base_dir, verbose)
 
 
 if __name__ == "__main__":
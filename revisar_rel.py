@@ -1,7 +1,69 @@
+import functools
 import xml.etree.ElementTree as ET
 from tkinter import Tk, filedialog
+from concurrent.futures import ThreadPoolExecutor
 import os
-
+import sys
+import threading
+
+try:
+    # lxml es opcional: su iterparse corre en C (libxml2) y filtra por
+    # etiqueta sin pasar cada nodo por Python.
+    import lxml.etree as LET
+except ImportError:
+    LET = None
+
+# Errores de parseo que puede levantar el parser activo.
+if LET is not None:
+    XML_PARSE_ERRORS = (ET.ParseError, LET.XMLSyntaxError)
+else:
+    XML_PARSE_ERRORS = (ET.ParseError,)
+
+# Namespace de relaciones y etiqueta en notación de Clark, armados una sola
+# vez a nivel de módulo en lugar de concatenar por llamada.
+NS_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+TAG_RELATIONSHIP = NS_REL + "Relationship"
+
+# Los errores se acumulan como tuplas (codigo, *datos) y solo se convierten
+# en texto cuando efectivamente se muestran; así el camino sin verbose no
+# paga el formateo y el que consume la lista puede filtrar por código.
+ERROR_FORMATS = {
+    "XML_INVALIDO": "[ERROR XML] Archivo no válido: {0}",
+    "SIN_ID": "[ERROR] Hay una relación sin Id.",
+    "ID_DUPLICADO": "[ERROR] Id duplicado: {0}",
+    "SIN_TYPE": "[ERROR] La relación {0} no tiene Type.",
+    "SIN_TARGET": "[ERROR] La relación {0} no tiene Target.",
+    "TARGET_INEXISTENTE": "[ERROR] El archivo referenciado NO existe: {0}",
+}
+
+
+def format_error(error):
+    """Convierte una tupla (codigo, *datos) en su mensaje imprimible."""
+    return ERROR_FORMATS[error[0]].format(*error[1:])
+
+# Marcadores que obligan a pasar por normpath: "..", separadores dobles,
+# segmentos "." y barras invertidas (en Windows normpath además cambia el
+# separador, así que cualquier ruta con "\\" toma el camino lento).
+_NORMPATH_MARKERS = ("..", "./", "//", "\\")
+
+_POSIX_SEP = os.sep == "/"
+
+
+def _join_normalized(base_dir, relative):
+    """Une base y ruta relativa, evitando normpath cuando ya está limpia."""
+    joined = os.path.join(base_dir, relative)
+    if (
+        _POSIX_SEP
+        and not any(marker in joined for marker in _NORMPATH_MARKERS)
+        and not joined.endswith(("/", "/."))
+    ):
+        return joined
+    return os.path.normpath(joined)
+
+
+# La resolución es pura manipulación de strings y los mismos Target se
+# repiten entre relaciones y archivos, así que el resultado se memoriza.
+@functools.lru_cache(maxsize=8192)
 def resolve_target_path(rels_path, target, package_root=None):
     """
     Convierte un Target relativo en una ruta absoluta real.
@@ -25,107 +87,182 @@ def resolve_target_path(rels_path, target, package_root=None):
         if not package_root:
             # Sin carpeta raíz no podemos resolver correctamente; devolvemos ruta relativa
             # a la base para evitar confundir con rutas del sistema.
-            return os.path.normpath(os.path.join(base_dir, target.lstrip("/")))
+            return _join_normalized(base_dir, target.lstrip("/"))
 
-        return os.path.normpath(os.path.join(package_root, target.lstrip("/")))
+        return _join_normalized(package_root, target.lstrip("/"))
 
     # Resolver rutas ../ y subcarpetas
-    full_path = os.path.normpath(os.path.join(base_dir, target))
-    return full_path
+    return _join_normalized(base_dir, target)
+
 
+def index_package_files(base_dir):
+    """Recorre la carpeta raíz una vez y devuelve las rutas de sus archivos.
 
-def validate_rels_file(path, package_root):
-    print(f"\n[INFO] Iniciando validación del archivo: {os.path.basename(path)}")
+    Validar un lote de .rels contra el conjunto en memoria evita un stat por
+    Target repetido en cada archivo. Las rutas se guardan con normcase para
+    que la búsqueda respete la comparación sin distinción de mayúsculas de
+    Windows (igual que os.path.exists en NTFS y que la comparación de rutas
+    de parte según la especificación OPC).
+    """
+    files = set()
+    pending = [base_dir]
+    while pending:
+        current = pending.pop()
+        try:
+            with os.scandir(current) as iterator:
+                for entry in iterator:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    else:
+                        files.add(os.path.normcase(os.path.normpath(entry.path)))
+        except OSError:
+            continue
+    return files
+
+
+def validate_rels_file(path, package_root, verbose=False, package_files=None):
+    # Con verbose=False solo se imprime el resumen final: en paquetes con
+    # miles de relaciones los print por elemento dominan el tiempo total.
+    log = print if verbose else _no_log
+
+    log(f"\n[INFO] Iniciando validación del archivo: {os.path.basename(path)}")
 
     errors = []
 
-    # 1. Validar XML
-    print("[CHECK] Verificando si el XML está bien formado...")
+    # 1. Validar XML en streaming: iterparse entrega cada <Relationship> al
+    # cerrarse su etiqueta y solo se retienen sus tres atributos, sin
+    # construir el árbol completo ni recorrerlo dos veces.
+    log("[CHECK] Extrayendo etiquetas <Relationship>...")
+    rels = []
     try:
-        tree = ET.parse(path)
-        print("[OK] XML bien formado.")
-    except ET.ParseError as e:
-        print(f"[ERROR XML] Archivo mal formado: {e}")
-        errors.append(f"[ERROR XML] Archivo no válido: {e}")
+        if LET is not None:
+            events = LET.iterparse(path, events=("end",), tag=TAG_RELATIONSHIP)
+        else:
+            events = ET.iterparse(path, events=("end",))
+        for _, el in events:
+            if el.tag == TAG_RELATIONSHIP:
+                rels.append((el.get("Id"), el.get("Type"), el.get("Target")))
+            el.clear()
+        log("[OK] XML bien formado.")
+    except XML_PARSE_ERRORS as e:
+        log(f"[ERROR XML] Archivo mal formado: {e}")
+        errors.append(("XML_INVALIDO", str(e)))
+        _print_summary(path, errors, verbose)
         return errors
 
-    root = tree.getroot()
-
-    # Namespace
-    NS_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
-
-    print("[CHECK] Extrayendo etiquetas <Relationship>...")
-    rels = root.findall(f".//{NS_REL}Relationship")
-    print(f"[INFO] Relaciones encontradas: {len(rels)}")
+    log(f"[INFO] Relaciones encontradas: {len(rels)}")
 
-    print("\n[INFO] Iniciando verificaciones por relación...\n")
+    log("\n[INFO] Iniciando verificaciones por relación...\n")
     ids = set()
+    # Los paquetes suelen referenciar el mismo destino desde varias
+    # relaciones; el resultado de cada stat se recuerda durante la llamada.
+    # Los targets que caen fuera de la raíz indexada siguen usando stat.
+    exists_cache = {}
+    # El prefijo y el índice están en normcase; las rutas resueltas se
+    # normalizan igual antes de compararlas.
+    package_prefix = (
+        os.path.normcase(os.path.normpath(package_root)) + os.sep
+        if package_root
+        else ""
+    )
 
-    for idx, rel in enumerate(rels, start=1):
-        print(f"\n--- Verificando relación #{idx} ---")
-
-        rid = rel.get("Id")
-        rtype = rel.get("Type")
-        rtarget = rel.get("Target")
+    for idx, (rid, rtype, rtarget) in enumerate(rels, start=1):
+        log(f"\n--- Verificando relación #{idx} ---")
 
         # Verificación de Id
-        print("[CHECK] Verificando Id...")
+        log("[CHECK] Verificando Id...")
         if not rid:
-            msg = "[ERROR] Hay una relación sin Id."
-            print(msg)
-            errors.append(msg)
+            error = ("SIN_ID",)
+            errors.append(error)
+            if verbose:
+                print(format_error(error))
         else:
-            print(f"[OK] Id presente: {rid}")
-            if rid in ids:
-                msg = f"[ERROR] Id duplicado: {rid}"
-                print(msg)
-                errors.append(msg)
+            log(f"[OK] Id presente: {rid}")
+            # add() detecta el duplicado en una sola búsqueda en el set:
+            # si el tamaño no cambió, el Id ya estaba.
+            before = len(ids)
+            ids.add(rid)
+            if len(ids) == before:
+                error = ("ID_DUPLICADO", rid)
+                errors.append(error)
+                if verbose:
+                    print(format_error(error))
             else:
-                ids.add(rid)
-                print("[OK] Id es único.")
+                log("[OK] Id es único.")
 
         # Verificación de Type
-        print("[CHECK] Verificando Type...")
+        log("[CHECK] Verificando Type...")
         if not rtype:
-            msg = f"[ERROR] La relación {rid} no tiene Type."
-            print(msg)
-            errors.append(msg)
+            error = ("SIN_TYPE", rid)
+            errors.append(error)
+            if verbose:
+                print(format_error(error))
         else:
-            print(f"[OK] Type presente: {rtype}")
+            log(f"[OK] Type presente: {rtype}")
 
         # Verificación de Target
-        print("[CHECK] Verificando Target...")
+        log("[CHECK] Verificando Target...")
         if not rtarget:
-            msg = f"[ERROR] La relación {rid} no tiene Target."
-            print(msg)
-            errors.append(msg)
+            error = ("SIN_TARGET", rid)
+            errors.append(error)
+            if verbose:
+                print(format_error(error))
         else:
-            print(f"[OK] Target presente: {rtarget}")
+            log(f"[OK] Target presente: {rtarget}")
 
             #  NUEVO: verificar si el archivo Target realmente existe
             resolved_path = resolve_target_path(path, rtarget, package_root)
-            print(f"[CHECK] Verificando existencia del archivo: {resolved_path}")
+            log(f"[CHECK] Verificando existencia del archivo: {resolved_path}")
 
-            if os.path.exists(resolved_path):
-                print("[OK] El archivo referenciado SÍ existe.")
+            resolved_cased = os.path.normcase(resolved_path)
+            if package_files is not None and resolved_cased.startswith(package_prefix):
+                # Dentro del paquete la existencia sale del índice ya armado.
+                target_exists = resolved_cased in package_files
             else:
-                msg = f"[ERROR] El archivo referenciado NO existe: {resolved_path}"
-                print(msg)
-                errors.append(msg)
-
-    print("\n===========================================")
-    print("[RESULTADO FINAL]")
+                target_exists = exists_cache.get(resolved_path)
+                if target_exists is None:
+                    target_exists = os.path.exists(resolved_path)
+                    exists_cache[resolved_path] = target_exists
 
-    if not errors:
-        print("[OK] No se encontraron errores en este archivo.")
-        errors.append("[OK] No se encontraron errores.")
-    else:
-        print(f"[ERRORES] Se encontraron {len(errors)} problema(s).")
+            if target_exists:
+                log("[OK] El archivo referenciado SÍ existe.")
+            else:
+                error = ("TARGET_INEXISTENTE", resolved_path)
+                errors.append(error)
+                if verbose:
+                    print(format_error(error))
 
-    print("===========================================\n")
+    _print_summary(path, errors, verbose)
     return errors
 
 
+def _no_log(*args, **kwargs):
+    pass
+
+
+# Con validación en paralelo, el candado evita que los resúmenes de dos
+# archivos se entremezclen en stdout.
+_summary_lock = threading.Lock()
+
+
+def _print_summary(path, errors, verbose):
+    with _summary_lock:
+        print("\n===========================================")
+        print(f"[RESULTADO FINAL] {os.path.basename(path)}")
+
+        if not errors:
+            print("[OK] No se encontraron errores en este archivo.")
+        else:
+            print(f"[ERRORES] Se encontraron {len(errors)} problema(s).")
+            if not verbose:
+                # Sin detalle por relación, los errores acumulados se listan
+                # acá para que sigan siendo visibles.
+                for error in errors:
+                    print(f"  {format_error(error)}")
+
+        print("===========================================\n")
+
+
 def main():
     Tk().withdraw()
 
@@ -147,8 +284,28 @@ def main():
         print("Ningún archivo seleccionado.")
         return
 
-    for path in paths:
-        validate_rels_file(path, base_dir)
+    verbose = "--verbose" in sys.argv or "-v" in sys.argv
+
+    # El índice del paquete se arma una sola vez para todo el lote.
+    package_files = index_package_files(base_dir)
+
+    if verbose:
+        # Con detalle por relación la salida debe seguir el orden de los
+        # archivos, así que se valida en serie.
+        for path in paths:
+            validate_rels_file(path, base_dir, verbose, package_files)
+        return
+
+    # Sin verbose cada archivo solo imprime su resumen (protegido por un
+    # candado), así que el lote se valida en paralelo: el parseo y los stat
+    # liberan el GIL y el tiempo total tiende al del archivo más lento.
+    with ThreadPoolExecutor(max_workers=min(32, len(paths))) as executor:
+        list(
+            executor.map(
+                lambda path: validate_rels_file(path, base_dir, False, package_files),
+                paths,
+            )
+        )
 
 
 if __name__ == "__main__":